@@ -186,6 +186,31 @@ class Group(click.Group):
         return decorator
 
 
+class LazyGroup(Group):
+    """ Group that defers building its sub commands until they are first
+        needed. `builder` is called once and returns a mapping of command
+        names to commands. """
+
+    def __init__(self, name=None, builder=None, **attrs):
+        Group.__init__(self, name, **attrs)
+        self._builder = builder
+
+    def _build(self):
+        if self._builder is not None:
+            self.commands.update(self._builder())
+            # Only forget the builder once it succeeds so errors are raised
+            # again on the next lookup instead of leaving an empty group.
+            self._builder = None
+
+    def list_commands(self, ctx):
+        self._build()
+        return Group.list_commands(self, ctx)
+
+    def get_command(self, ctx, cmd_name):
+        self._build()
+        return Group.get_command(self, ctx, cmd_name)
+
+
 class GeneratedCommands(Group):
     """ Subclass the click.Group in order to have segregated plugins within
         the modules directory """
@@ -105,21 +105,14 @@ option('--'+SPC_CTL_ARG, type=(click.STRING, click.INT),
 
 # Remove the generated params for the group names and group member lists.
 # Add the new target-groups option.
-params = []
-for p in CREATE_CMD.params:
-    if p.payload_name in (SPC_OLD_NCV, SPC_OLD_NCN, SPC_OLD_NIDS):
-        continue
-    # Hack to force order in list in front of globals
-    # only for making the UX better
-    if p.payload_name == SPC_NIDS_ARG:
-        params.insert(0, p)
-    elif p.payload_name == SPC_CTL_ARG:
-        params.insert(1, p)
-    else:
-        params.append(p)
-
-# Update the command with the new params
-CREATE_CMD.params = params
+# Hack to force order in list in front of globals
+# only for making the UX better
+SPC_PARAMS = {p.payload_name: p for p in CREATE_CMD.params}
+CREATE_CMD.params = [SPC_PARAMS[SPC_NIDS_ARG], SPC_PARAMS[SPC_CTL_ARG]] + [
+    p for p in CREATE_CMD.params
+    if p.payload_name not in (SPC_OLD_NCV, SPC_OLD_NCN, SPC_OLD_NIDS,
+                              SPC_NIDS_ARG, SPC_CTL_ARG)
+]
 
 def set_power_cap_shim(func):
     """ Callback function to create our own payload """
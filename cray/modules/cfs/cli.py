@@ -34,87 +34,130 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 # pylint: disable=invalid-name
 # pylint: disable=too-many-arguments
-import json
+import os
+import stat
 
 import click
+try:
+    import orjson as _json
+except ImportError:  # pragma: NO COVER
+    import json as _json
 
-from cray.core import option
+from cray.core import group, option, LazyGroup
 from cray.generator import generate, _opt_callback
 from cray.constants import FROM_FILE_TAG
 
 CURRENT_VERSION = 'v2'
+DESCRIPTION = 'Configuration Framework Service'
+# PATCH is generated as its own command so that configurations can use both
+# PUT and PATCH from a single generated tree. Every other group maps it back
+# to update in setup_patch_commands.
 SWAGGER_OPTS = {
     'vocabulary': {
-        'deleteall': 'deleteall'
+        'deleteall': 'deleteall',
+        'patch': 'patch'
     }
 }
 
-cli = generate(__file__, condense=False, swagger_opts=SWAGGER_OPTS)
-cli.commands = cli.commands[CURRENT_VERSION].commands
-
 
 def setup(cfs_cli):
     """ Sets up all cfs overrides """
     setup_configurations_update(cfs_cli)
+    setup_patch_commands(cfs_cli)
     setup_sessions_create(cfs_cli)
     setup_components_update(cfs_cli)
 
 
+def _replace_generated_params(command, prefix):
+    """
+    Move the two options just added to command to the front of its params and
+    drop the generated params they replace, i.e. those named with prefix.
+    """
+    command.params = command.params[-2:] + [
+        param for param in command.params[:-2] if not param.name.startswith(prefix)
+    ]
+
+
+def setup_patch_commands(cfs_cli):
+    """ Use the generated patch commands as the update commands """
+    for cmd_group in cfs_cli.commands.values():
+        patch_command = cmd_group.commands.pop('patch', None)
+        if patch_command is not None:
+            patch_command.name = 'update'
+            cmd_group.commands['update'] = patch_command
+
+
 # CONFIGURATIONS #
 
+def _read_file(path):
+    """
+    Read a whole file. A regular file with a size is read in a single read
+    sized from its stat. Reading always continues until EOF, since pipes,
+    procfs/sysfs files and files that grow after the stat can't be trusted
+    to report their size.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        if stat.S_ISREG(st.st_mode) and st.st_size > 0:
+            chunks.append(os.read(fd, st.st_size))
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def _load_configuration_file(file_name):
+    """ Parse a configuration file, reporting invalid JSON as a usage error """
+    try:
+        return _json.loads(_read_file(file_name))
+    except ValueError:
+        # pylint: disable=raise-missing-from
+        raise click.UsageError('Configuration file not valid JSON')
+
+
 def create_configurations_update_shim(update_callback, patch_callback):
     """ Callback function to custom create our own payload """
     def _decorator(configuration_id, file, update_branches, **kwargs):
-        file_name = file['value']
-        if file_name:  # pylint: disable=no-else-return
-            with open(file['value'], 'r', encoding='utf-8') as f:
-                data = json.loads(f.read())
-            payload = data
-            # Hack to tell the CLI we are passing our own payload; don't generate
-            kwargs[FROM_FILE_TAG] = {"value": payload, "name": FROM_FILE_TAG}
-            return update_callback(configuration_id=configuration_id, **kwargs)
-        elif update_branches['value']:
+        # Check for a branch update first so the file is only read when its
+        # contents are actually going to be sent.
+        if update_branches['value']:
             return patch_callback(configuration_id=configuration_id, **kwargs)
-        else:
+        file_name = file['value']
+        if not file_name:
             raise Exception('Either --file or --update-branches must be set for updates')
+        payload = _load_configuration_file(file_name)
+        # Hack to tell the CLI we are passing our own payload; don't generate
+        kwargs[FROM_FILE_TAG] = {"value": payload, "name": FROM_FILE_TAG}
+        return update_callback(configuration_id=configuration_id, **kwargs)
     return _decorator
 
 
 def setup_configurations_update(cfs_cli):
     """ Adds the --file and --update-branches parameters for configuration updates """
-    tmp_swagger_opts = {
-        'vocabulary': {
-            'patch': 'patch'
-        }
-    }
-    tmp_cli = generate(__file__, condense=False, swagger_opts=tmp_swagger_opts)
-    tmp_cli.commands = tmp_cli.commands[CURRENT_VERSION].commands
-
-    update_command = tmp_cli.commands['configurations'].commands['update']
-    patch_command = tmp_cli.commands['configurations'].commands['patch']
-
-    option('--file', callback=_opt_callback, type=str, metavar='TEXT',
+    configurations = cfs_cli.commands['configurations']
+    update_command = configurations.commands['update']
+    # Only the callback of the generated patch command is needed; removing the
+    # command from the tree lets the rest of it be freed.
+    patch_callback = configurations.commands.pop('patch').callback
+
+    option('--file', callback=_opt_callback, metavar='TEXT',
+           type=click.Path(exists=True, dir_okay=False),
            help="A file containing the json for a configuration"
                 " (Required unless updating branches)")(update_command)
     option('--update-branches', callback=_opt_callback, is_flag=True,
            help="Updates the commit ids for all config layers with branches")(update_command)
-    new_params = update_command.params[-2:]
-    for param in update_command.params[:-2]:
-        if not param.name.startswith('layers_'):
-            new_params.append(param)
-    update_command.params = new_params
+    _replace_generated_params(update_command, 'layers_')
     update_command.callback = create_configurations_update_shim(update_command.callback,
-                                                         patch_command.callback)
-
-    cfs_cli.commands['configurations'].commands['update'] = update_command
+                                                                patch_callback)
 
 
 # SESSIONS #
 
-# Update session should only be in the api as it is not user friendly and
-# is only used by CFS to update session status.
-del cli.commands['sessions'].commands['update']
-
 
 def _targets_callback(cb):
     """
@@ -122,10 +165,8 @@ def _targets_callback(cb):
     mappings. Callback function for the target-groups option.
     """
     def _cb(ctx, param, value):
-        groups = []
-        for group, members in value:
-            members = [m.strip() for m in members.split(',')]
-            groups.append({"name": group, "members": members})
+        groups = [{"name": group, "members": [m.strip() for m in members.split(',')]}
+                  for group, members in value]
         if cb:
             return cb(ctx, param, groups)
         return groups
@@ -135,7 +176,7 @@ def _targets_callback(cb):
 def create_sessions_create_shim(func):
     """ Callback function to custom create our own payload """
     def _decorator(target_definition, target_group, tags, **kwargs):
-        payload = {v['name']: v['value'] for _, v in kwargs.items() if v['value'] is not None}
+        payload = {v['name']: v['value'] for v in kwargs.values() if v['value'] is not None}
         payload['target'] = {
             'definition': target_definition["value"],
             'groups': target_group['value']
@@ -158,6 +199,10 @@ GROUPS_PAYLOAD = 'target-group'
 
 def setup_sessions_create(cfs_cli):
     """ Adds the --tags and --target-group parameters for session creates """
+    # Update session should only be in the api as it is not user friendly and
+    # is only used by CFS to update session status.
+    del cfs_cli.commands['sessions'].commands['update']
+
     command = cfs_cli.commands['sessions'].commands['create']
 
     # Create a new option which can handle multiple groups with individual names
@@ -173,12 +218,10 @@ def setup_sessions_create(cfs_cli):
 
     # Remove the generated params for the group names and group member lists.
     # Add the new target-groups option.
-    new_params = command.params[-2:]
-    for param in command.params[:-2]:
-        if param.payload_name not in (GROUP_MEMBERS_PAYLOAD, GROUP_NAME_PAYLOAD):
-            new_params.append(param)
-    # Update the command with the new params
-    command.params = new_params
+    command.params = command.params[-2:] + [
+        param for param in command.params[:-2]
+        if param.payload_name not in (GROUP_MEMBERS_PAYLOAD, GROUP_NAME_PAYLOAD)
+    ]
     command.callback = create_sessions_create_shim(command.callback)
 
 
@@ -186,9 +229,9 @@ def setup_sessions_create(cfs_cli):
 def create_components_update_shim(func):
     """ Callback function to custom create our own payload """
     def _decorator(component_id, state, tags, **kwargs):
-        payload = {v['name']: v['value'] for _, v in kwargs.items() if v['value'] is not None}
+        payload = {v['name']: v['value'] for v in kwargs.values() if v['value'] is not None}
         if state['value']:
-            payload['state'] = json.loads(state['value'])
+            payload['state'] = _json.loads(state['value'])
         if tags['value']:
             payload['tags'] = {tag.split('=')[0].strip(): tag.split('=')[1].strip()
                                for tag in tags['value'].split(',')}
@@ -206,12 +249,20 @@ def setup_components_update(cfs_cli):
            help="The component state. Set to [] to clear.")(command)
     option('--tags', callback=_opt_callback, required=False, type=str, metavar='TEXT',
            help="User defined tags.  A comma separated list of key=value")(command)
-    new_params = command.params[-2:]
-    for param in command.params[:-2]:
-        if not param.name.startswith('state_'):
-            new_params.append(param)
-    command.params = new_params
+    _replace_generated_params(command, 'state_')
     command.callback = create_components_update_shim(command.callback)
 
 
-setup(cli)
+def _build_cli():
+    """ Generate the cfs commands and apply the overrides """
+    cfs_cli = generate(__file__, condense=False, swagger_opts=SWAGGER_OPTS)
+    cfs_cli.commands = cfs_cli.commands[CURRENT_VERSION].commands
+    setup(cfs_cli)
+    return cfs_cli.commands
+
+
+# Generating from the spec is deferred until a cfs subcommand is needed, so
+# loading this module for the top level help stays cheap.
+@group('cfs', cls=LazyGroup, builder=_build_cli, help=DESCRIPTION)
+def cli():
+    """ Configuration Framework Service """
@@ -28,6 +28,8 @@ OTHER DEALINGS IN THE SOFTWARE.
 # pylint: disable=too-many-arguments
 # pylint: disable=unused-argument
 import json
+import os
+import threading
 
 from ..utils.runner import cli_runner  # pylint: disable=unused-import
 from ..utils.rest import rest_mock  # pylint: disable=unused-import
@@ -158,3 +160,159 @@ def test_cray_cfs_session_create_missing_required(cli_runner, rest_mock):
     result = runner.invoke(cli, ['cfs', 'sessions', 'create', '--configuration-name', 'foo'])
     assert result.exit_code == 2
     assert '--name' in result.output
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_file(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --file ... """
+    runner, cli, config = cli_runner
+    payload = {
+        'layers': [{
+            'cloneUrl': 'https://example.com/repo.git',
+            'commit': 'abc123',
+            'playbook': 'site.yml',
+        }]
+    }
+    filename = 'cfs_configuration_test.json'
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', filename])
+    os.remove(filename)
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PUT'
+    assert data['url'] == '{}/apis/cfs/v2/configurations/foo'.format(
+        config['default']['hostname'])
+    assert data['body'] == payload
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_file_pipe(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --file with a named pipe """
+    runner, cli, config = cli_runner
+    payload = {'layers': []}
+    filename = 'cfs_configuration_test.fifo'
+    os.mkfifo(filename)
+
+    def _write():
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+
+    # Daemon thread with a timeout so a failure before the pipe is read
+    # can't leave the writer blocked in open() and hang the suite.
+    writer = threading.Thread(target=_write, daemon=True)
+    writer.start()
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', filename])
+    writer.join(timeout=10)
+    os.remove(filename)
+    assert not writer.is_alive()
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PUT'
+    assert data['url'] == '{}/apis/cfs/v2/configurations/foo'.format(
+        config['default']['hostname'])
+    assert data['body'] == payload
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_file_zero_size(cli_runner, rest_mock, monkeypatch):
+    """ Test cray cfs configurations update --file with a regular file that
+        reports a size of 0, like procfs or sysfs files """
+    runner, cli, config = cli_runner
+    payload = {'layers': []}
+    filename = 'cfs_configuration_test.json'
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    real_fstat = os.fstat
+
+    def _fstat(fd):
+        st = real_fstat(fd)
+        return os.stat_result((st.st_mode, st.st_ino, st.st_dev, st.st_nlink,
+                               st.st_uid, st.st_gid, 0, st.st_atime,
+                               st.st_mtime, st.st_ctime))
+
+    monkeypatch.setattr(os, 'fstat', _fstat)
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', filename])
+    monkeypatch.undo()
+    os.remove(filename)
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PUT'
+    assert data['url'] == '{}/apis/cfs/v2/configurations/foo'.format(
+        config['default']['hostname'])
+    assert data['body'] == payload
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_branches(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --update-branches """
+    runner, cli, config = cli_runner
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--update-branches'])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PATCH'
+    assert data['url'] == '{}/apis/cfs/v2/configurations/foo'.format(
+        config['default']['hostname'])
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_components_update(cli_runner, rest_mock):
+    """ Test cray cfs components update ... """
+    runner, cli, config = cli_runner
+    result = runner.invoke(cli, ['cfs', 'components', 'update', 'x1000c0s0b0n0',
+                                 '--enabled', 'true',
+                                 '--state', '[]',
+                                 '--tags', 'foo=bar'])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PATCH'
+    assert data['url'] == '{}/apis/cfs/v2/components/x1000c0s0b0n0'.format(
+        config['default']['hostname'])
+    assert data['body'] == {
+        'enabled': True,
+        'state': [],
+        'tags': {'foo': 'bar'},
+    }
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_branches_with_file(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --update-branches takes precedence over --file """
+    runner, cli, _ = cli_runner
+    filename = 'cfs_configuration_test.json'
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('not json')
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', filename, '--update-branches'])
+    os.remove(filename)
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['method'] == 'PATCH'
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_file_missing(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --file with a file that does not exist """
+    runner, cli, _ = cli_runner
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', 'does_not_exist.json'])
+    assert result.exit_code == 2
+    assert '--file' in result.output
+
+
+# pylint: disable=redefined-outer-name
+def test_cray_cfs_configurations_update_file_invalid(cli_runner, rest_mock):
+    """ Test cray cfs configurations update --file with a file that is not JSON """
+    runner, cli, _ = cli_runner
+    filename = 'cfs_configuration_test.json'
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('not json')
+    result = runner.invoke(cli, ['cfs', 'configurations', 'update', 'foo',
+                                 '--file', filename])
+    os.remove(filename)
+    assert result.exit_code == 2
+    assert 'not valid JSON' in result.output
@@ -0,0 +1,61 @@
+""" Test the click subclasses and utilities in cray.core
+
+MIT License
+
+(C) Copyright [2020] Hewlett Packard Enterprise Development LP
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included
+in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+import click
+import pytest
+
+from cray.core import LazyGroup
+
+
+def test_lazy_group_builds_once_on_first_lookup():
+    """ Test LazyGroup only calls its builder on the first lookup """
+    calls = []
+    sub = click.Command('sub')
+
+    def _builder():
+        calls.append(True)
+        return {'sub': sub}
+
+    group = LazyGroup('lazy', builder=_builder)
+    assert not calls
+
+    assert group.get_command(None, 'sub') is sub
+    assert group.list_commands(None) == ['sub']
+    assert len(calls) == 1
+
+
+def test_lazy_group_build_error_is_raised_again():
+    """ Test LazyGroup raises a builder error on every lookup """
+    calls = []
+
+    def _builder():
+        calls.append(True)
+        raise ValueError('bad spec')
+
+    group = LazyGroup('lazy', builder=_builder)
+    with pytest.raises(ValueError):
+        group.list_commands(None)
+    with pytest.raises(ValueError):
+        group.get_command(None, 'sub')
+    assert len(calls) == 2